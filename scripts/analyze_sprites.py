@@ -8,13 +8,17 @@ import os
 from PIL import Image
 import numpy as np
 
-def detect_frame_size(image_path):
+from analyze_sprites_simple import get_texture_uid, read_png_dimensions
+
+def load_image_array(image_path):
+    """Decode a sprite sheet once into a numpy array for analysis."""
+    with Image.open(image_path) as img:
+        img.load()
+        return np.asarray(img)
+
+def detect_frame_size(img_array):
     """Detect frame size by looking for repeating patterns."""
-    img = Image.open(image_path)
-    width, height = img.size
-    
-    # Convert to numpy array for analysis
-    img_array = np.array(img)
+    height, width = img_array.shape[:2]
     
     # Try common frame sizes
     common_sizes = [32, 48, 64, 96, 128]
@@ -24,28 +28,23 @@ def detect_frame_size(image_path):
     
     for size in common_sizes:
         if width % size == 0 and height % size == 0:
-            # Check if frames are uniform by sampling edges
-            score = 0
             cols = width // size
             rows = height // size
             
-            # Sample corners of frames to see if they're consistent
-            for r in range(min(rows, 3)):
-                for c in range(min(cols, 3)):
-                    x = c * size
-                    y = r * size
-                    # Check if frame has content (not all transparent/empty)
-                    frame = img_array[y:y+size, x:x+size]
-                    if len(frame.shape) == 3:
-                        # Check alpha channel if exists
-                        if frame.shape[2] == 4:
-                            alpha = frame[:, :, 3]
-                            if np.any(alpha > 0):
-                                score += 1
-                        else:
-                            # No alpha, check if not all same color
-                            if not np.all(frame == frame[0, 0]):
-                                score += 1
+            # Score the top-left 3x3 block of frames in one pass: view it as
+            # (rows, size, cols, size, channels) and reduce over the pixel axes
+            sample_rows = min(rows, 3)
+            sample_cols = min(cols, 3)
+            score = 0
+            if img_array.ndim == 3:
+                tiles = img_array[:sample_rows * size, :sample_cols * size].reshape(
+                    sample_rows, size, sample_cols, size, -1)
+                if tiles.shape[-1] == 4:
+                    # Frame has content if any pixel is not fully transparent
+                    score = int((tiles[..., 3] > 0).any(axis=(1, 3)).sum())
+                else:
+                    # No alpha, frame has content if not all the same color
+                    score = int((tiles != tiles[:, :1, :, :1]).any(axis=(1, 3, 4)).sum())
             
             if score > best_score:
                 best_score = score
@@ -53,171 +52,151 @@ def detect_frame_size(image_path):
     
     return best_size if best_size else 64  # Default to 64
 
-def detect_animations(image_path, frame_size):
+def detect_animations(img_array, frame_size):
     """Detect animation rows/columns."""
-    img = Image.open(image_path)
-    width, height = img.size
+    height, width = img_array.shape[:2]
     
     cols = width // frame_size
     rows = height // frame_size
     
-    # Analyze each row to see if it contains frames
-    img_array = np.array(img)
+    # View the sheet as a (rows, cols, frame, frame, channels) grid of frames
+    # and compute a has_content mask for every frame in one pass
+    has_content = np.zeros((rows, cols), dtype=bool)
+    if img_array.ndim == 3:
+        tiles = img_array[:rows * frame_size, :cols * frame_size].reshape(
+            rows, frame_size, cols, frame_size, -1).swapaxes(1, 2)
+        if tiles.shape[-1] == 4:  # RGBA
+            # Threshold for transparency. Check every 4th pixel first and only
+            # scan the full alpha plane of frames where that found nothing;
+            # most frames with content are decided by the sample, which is
+            # cheaper than counting coverage over every alpha byte
+            alpha = tiles[..., 3]
+            has_content = (alpha[:, :, ::4, ::4] > 10).any(axis=(2, 3))
+            empty = ~has_content
+            if empty.any():
+                has_content[empty] = (alpha[empty] > 10).any(axis=(1, 2))
+        else:  # RGB
+            # Check if not all same color (within tolerance of the first pixel).
+            # max - min is the absolute difference without leaving uint8
+            first = tiles[:, :, :1, :1]
+            diff = np.maximum(tiles, first) - np.minimum(tiles, first)
+            has_content = (diff > 5).any(axis=(2, 3, 4))
     
     animation_rows = []
-    for r in range(rows):
-        row_frames = []
-        for c in range(cols):
-            x = c * frame_size
-            y = r * frame_size
-            frame = img_array[y:y+frame_size, x:x+frame_size]
-            
-            # Check if frame has content
-            has_content = False
-            if len(frame.shape) == 3:
-                if frame.shape[2] == 4:  # RGBA
-                    alpha = frame[:, :, 3]
-                    has_content = np.any(alpha > 10)  # Threshold for transparency
-                else:  # RGB
-                    # Check if not all same color
-                    has_content = not np.allclose(frame, frame[0, 0, :], atol=5)
-            
-            if has_content:
-                row_frames.append(c)
-        
-        if row_frames:
-            animation_rows.append({
-                'row': r,
-                'frames': sorted(row_frames),
-                'frame_count': len(row_frames)
-            })
+    for r in np.flatnonzero(has_content.any(axis=1)):
+        row_frames = np.flatnonzero(has_content[r])
+        animation_rows.append({
+            'row': int(r),
+            'frames': row_frames.tolist(),
+            'frame_count': int(row_frames.size)
+        })
     
     return animation_rows, cols, rows
 
-def generate_player_spriteframes(image_path, output_path):
-    """Generate player SpriteFrames resource."""
-    frame_size = detect_frame_size(image_path)
-    animations, cols, rows = detect_animations(image_path, frame_size)
+def analyze_sheet(image_path):
+    """Detect frame size and animation rows for a sprite sheet."""
+    img_array = load_image_array(image_path)
     
-    print(f"Detected frame size: {frame_size}x{frame_size}")
-    print(f"Sprite sheet: {cols} columns x {rows} rows")
-    print(f"Found {len(animations)} animation rows")
+    # Characters should be 64x64 per user specification, so only score
+    # candidate frame sizes when the header says 64 doesn't fit
+    dims = read_png_dimensions(image_path)
+    if dims and dims[0] % 64 == 0 and dims[1] % 64 == 0:
+        frame_size = 64
+    else:
+        frame_size = detect_frame_size(img_array)
     
-    # Get texture UID from import file
-    import_file = image_path.replace('.png', '.png.import')
-    texture_uid = None
-    if os.path.exists(import_file):
-        with open(import_file, 'r') as f:
-            for line in f:
-                if 'uid=' in line:
-                    texture_uid = line.split('uid="')[1].split('"')[0]
-                    break
+    animations, cols, rows = detect_animations(img_array, frame_size)
+    return frame_size, animations, cols, rows
+
+SPRITEFRAMES_TMPL = (
+    '[gd_resource type="SpriteFrames" load_steps=2 format=3 uid="{resource_uid}"]\n'
+    '\n'
+    '[ext_resource type="Texture2D" uid="{texture_uid}" path="{tex_path}" id="{ext_id}"]\n'
+    '\n'
+    '{sub_resources}\n'
+    '\n'
+    '[resource]\n'
+    'animations = {{\n'
+    '{animations}\n'
+    '}}'
+)
+
+SUBRES_TMPL = (
+    '[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
+    'atlas = ExtResource("{ext_id}")\n'
+    'region = Rect2({x}, {y}, {size}, {size}){flip}'
+)
+
+ANIM_TMPL = (
+    '"{name}": {{\n'
+    '"frames": [{frames}],\n'
+    '"loop": true,\n'
+    '"speed": {speed}\n'
+    '}},'
+)
+
+def _animations_spec(animations):
+    """Map detected animation rows to (name, row, frame_cols, flip_h, speed) entries."""
+    spec = []
     
-    if not texture_uid:
-        texture_uid = "uid://player_texture"
+    # First 3 rows are walk_down, walk_up, walk_right
+    anim_names = ['walk_down', 'walk_up', 'walk_right']
+    for anim_name, anim_row in zip(anim_names, animations):
+        spec.append((anim_name, anim_row['row'], anim_row['frames'], False, 8.0))
     
-    # Generate SpriteFrames resource
-    lines = [
-        f'[gd_resource type="SpriteFrames" load_steps=2 format=3 uid="uid://mg0soy5bnyun"]',
-        '',
-        f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://assets/characters/player/player_character_wizard.png" id="1_player"]',
-        ''
-    ]
+    # Idle from first frame
+    if animations:
+        first_anim = animations[0]
+        spec.append(('idle', first_anim['row'], first_anim['frames'][:1], False, 2.0))
     
-    sub_resources = []
-    animation_defs = {}
+    # walk_left (flipped walk_right)
+    if len(animations) > 2:
+        right_anim = animations[2]
+        spec.append(('walk_left', right_anim['row'], right_anim['frames'], True, 8.0))
     
-    # Map detected rows to animation names
-    anim_names = ['walk_down', 'walk_up', 'walk_right']
-    for i, anim_row in enumerate(animations[:3]):  # First 3 rows
-        anim_name = anim_names[i] if i < len(anim_names) else f"anim_{i}"
+    return spec
+
+def _emit_spriteframes(texture_uid, ext_id, tex_path, resource_uid, animations_spec, frame_size, output_path):
+    """Write a SpriteFrames resource with one AtlasTexture per animation frame."""
+    sub_by_id = {}
+    anim_blocks = []
+    
+    for anim_name, row, frame_cols, flip_h, speed in animations_spec:
         frames = []
-        
-        for frame_idx, col in enumerate(anim_row['frames']):
+        for frame_idx, col in enumerate(frame_cols):
             sub_id = f'AtlasTexture_{anim_name}_{frame_idx}'
-            x = col * frame_size
-            y = anim_row['row'] * frame_size
-            
-            sub_resources.append(
-                f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                f'atlas = ExtResource("1_player")\n'
-                f'region = Rect2({x}, {y}, {frame_size}, {frame_size})'
-            )
+            sub_by_id[sub_id] = SUBRES_TMPL.format(
+                sub_id=sub_id, ext_id=ext_id, x=col * frame_size, y=row * frame_size,
+                size=frame_size, flip='\nflip_h = true' if flip_h else '')
             frames.append(f'SubResource("{sub_id}")')
-        
-        # Create idle from first frame
-        idle_sub_id = f'AtlasTexture_idle'
-        if idle_sub_id not in [s.split('id="')[1].split('"')[0] for s in sub_resources]:
-            first_frame = anim_row['frames'][0]
-            sub_resources.insert(0, 
-                f'[sub_resource type="AtlasTexture" id="{idle_sub_id}"]\n'
-                f'atlas = ExtResource("1_player")\n'
-                f'region = Rect2({first_frame * frame_size}, {anim_row["row"] * frame_size}, {frame_size}, {frame_size})'
-            )
-        
-        animation_defs[anim_name] = {
-            'frames': frames,
-            'loop': True,
-            'speed': 8.0
-        }
+        anim_blocks.append(ANIM_TMPL.format(name=anim_name, frames=', '.join(frames), speed=speed))
     
-    # Add idle animation
-    animation_defs['idle'] = {
-        'frames': ['SubResource("AtlasTexture_idle")'],
-        'loop': True,
-        'speed': 2.0
-    }
-    
-    # Add walk_left (flipped walk_right)
-    if 'walk_right' in animation_defs:
-        walk_right_frames = animation_defs['walk_right']['frames']
-        left_frames = []
-        for i, frame_ref in enumerate(walk_right_frames):
-            sub_id = f'AtlasTexture_walk_left_{i}'
-            # Extract region from walk_right frame
-            right_sub = [s for s in sub_resources if f'walk_right_{i}' in s][0]
-            region_line = [l for l in right_sub.split('\n') if 'region =' in l][0]
-            region = region_line.split('Rect2(')[1].split(')')[0]
-            
-            sub_resources.append(
-                f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                f'atlas = ExtResource("1_player")\n'
-                f'region = Rect2({region})\n'
-                f'flip_h = true'
-            )
-            left_frames.append(f'SubResource("{sub_id}")')
-        
-        animation_defs['walk_left'] = {
-            'frames': left_frames,
-            'loop': True,
-            'speed': 8.0
-        }
-    
-    # Write sub-resources
-    lines.extend(sub_resources)
-    lines.append('')
-    lines.append('[resource]')
-    lines.append('animations = {')
+    with open(output_path, 'w') as f:
+        f.write(SPRITEFRAMES_TMPL.format(
+            resource_uid=resource_uid, texture_uid=texture_uid, tex_path=tex_path, ext_id=ext_id,
+            sub_resources='\n'.join(sub_by_id.values()), animations='\n'.join(anim_blocks)))
+
+def generate_player_spriteframes(image_path, output_path):
+    """Generate player SpriteFrames resource."""
+    frame_size, animations, cols, rows = analyze_sheet(image_path)
     
-    # Write animations
-    for anim_name, anim_data in animation_defs.items():
-        lines.append(f'"{anim_name}": {{')
-        lines.append(f'"frames": [{", ".join(anim_data["frames"])}],')
-        lines.append(f'"loop": {str(anim_data["loop"]).lower()},')
-        lines.append(f'"speed": {anim_data["speed"]}')
-        lines.append('},')
+    print(f"Detected frame size: {frame_size}x{frame_size}")
+    print(f"Sprite sheet: {cols} columns x {rows} rows")
+    print(f"Found {len(animations)} animation rows")
     
-    lines.append('}')
+    # Get texture UID from import file
+    import_file = image_path.replace('.png', '.png.import')
+    texture_uid = get_texture_uid(import_file) or "uid://player_texture"
     
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    _emit_spriteframes(
+        texture_uid, '1_player', 'res://assets/characters/player/player_character_wizard.png',
+        'uid://mg0soy5bnyun', _animations_spec(animations), frame_size, output_path)
     
     print(f"Generated: {output_path}")
 
 def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
     """Generate NPC SpriteFrames resources."""
-    frame_size = detect_frame_size(image_path)
-    animations, cols, rows = detect_animations(image_path, frame_size)
+    frame_size, animations, cols, rows = analyze_sheet(image_path)
     
     print(f"\nNPC Sprite Sheet Analysis:")
     print(f"Detected frame size: {frame_size}x{frame_size}")
@@ -226,23 +205,15 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
     
     # Get texture UID
     import_file = image_path.replace('.png', '.png.import')
-    texture_uid = None
-    if os.path.exists(import_file):
-        with open(import_file, 'r') as f:
-            for line in f:
-                if 'uid=' in line:
-                    texture_uid = line.split('uid="')[0].split('uid="')[1].split('"')[0] if 'uid="' in line else None
-                    if not texture_uid:
-                        parts = line.split('uid=')
-                        if len(parts) > 1:
-                            texture_uid = parts[1].split('"')[1] if '"' in parts[1] else parts[1].strip()
-                    break
-    
-    if not texture_uid:
-        texture_uid = "uid://npc_texture"
+    texture_uid = get_texture_uid(import_file) or "uid://npc_texture"
     
     # Determine NPC layout - assume each NPC takes a set of rows
     rows_per_npc = rows // npc_count if rows >= npc_count else 1
+    uid_map = {
+        0: "uid://b34fnliuo7eqq",
+        1: "uid://b34gnliuo7eqr",
+        2: "uid://b34hnliuo7eqs"
+    }
     
     for npc_idx in range(npc_count):
         npc_start_row = npc_idx * rows_per_npc
@@ -254,101 +225,10 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
             npc_animations = animations[npc_idx * anims_per_npc:(npc_idx + 1) * anims_per_npc]
         
         output_path = output_paths[npc_idx]
-        uid_map = {
-            0: "uid://b34fnliuo7eqq",
-            1: "uid://b34gnliuo7eqr",
-            2: "uid://b34hnliuo7eqs"
-        }
-        
-        lines = [
-            f'[gd_resource type="SpriteFrames" load_steps=2 format=3 uid="{uid_map.get(npc_idx, "uid://npc_frames")}"]',
-            '',
-            f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://assets/characters/npcs/npc_sprites.png" id="1_npcs"]',
-            ''
-        ]
-        
-        sub_resources = []
-        animation_defs = {}
-        
-        anim_names = ['walk_down', 'walk_up', 'walk_right']
-        for i, anim_row in enumerate(npc_animations[:3]):
-            anim_name = anim_names[i] if i < len(anim_names) else f"anim_{i}"
-            frames = []
-            
-            for frame_idx, col in enumerate(anim_row['frames']):
-                sub_id = f'AtlasTexture_{anim_name}_{frame_idx}'
-                x = col * frame_size
-                y = anim_row['row'] * frame_size
-                
-                sub_resources.append(
-                    f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                    f'atlas = ExtResource("1_npcs")\n'
-                    f'region = Rect2({x}, {y}, {frame_size}, {frame_size})'
-                )
-                frames.append(f'SubResource("{sub_id}")')
-            
-            animation_defs[anim_name] = {
-                'frames': frames,
-                'loop': True,
-                'speed': 8.0
-            }
-        
-        # Idle from first frame
-        if npc_animations:
-            first_anim = npc_animations[0]
-            first_col = first_anim['frames'][0]
-            idle_sub_id = 'AtlasTexture_idle'
-            sub_resources.insert(0,
-                f'[sub_resource type="AtlasTexture" id="{idle_sub_id}"]\n'
-                f'atlas = ExtResource("1_npcs")\n'
-                f'region = Rect2({first_col * frame_size}, {first_anim["row"] * frame_size}, {frame_size}, {frame_size})'
-            )
-            animation_defs['idle'] = {
-                'frames': [f'SubResource("{idle_sub_id}")'],
-                'loop': True,
-                'speed': 2.0
-            }
-        
-        # walk_left (flipped walk_right)
-        if 'walk_right' in animation_defs:
-            walk_right_frames = animation_defs['walk_right']['frames']
-            left_frames = []
-            for i, frame_ref in enumerate(walk_right_frames):
-                sub_id = f'AtlasTexture_walk_left_{i}'
-                right_sub = [s for s in sub_resources if f'walk_right_{i}' in s][0]
-                region_line = [l for l in right_sub.split('\n') if 'region =' in l][0]
-                region = region_line.split('Rect2(')[1].split(')')[0]
-                
-                sub_resources.append(
-                    f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                    f'atlas = ExtResource("1_npcs")\n'
-                    f'region = Rect2({region})\n'
-                    f'flip_h = true'
-                )
-                left_frames.append(f'SubResource("{sub_id}")')
-            
-            animation_defs['walk_left'] = {
-                'frames': left_frames,
-                'loop': True,
-                'speed': 8.0
-            }
-        
-        lines.extend(sub_resources)
-        lines.append('')
-        lines.append('[resource]')
-        lines.append('animations = {')
-        
-        for anim_name, anim_data in animation_defs.items():
-            lines.append(f'"{anim_name}": {{')
-            lines.append(f'"frames": [{", ".join(anim_data["frames"])}],')
-            lines.append(f'"loop": {str(anim_data["loop"]).lower()},')
-            lines.append(f'"speed": {anim_data["speed"]}')
-            lines.append('},')
-        
-        lines.append('}')
-        
-        with open(output_path, 'w') as f:
-            f.write('\n'.join(lines))
+        _emit_spriteframes(
+            texture_uid, '1_npcs', 'res://assets/characters/npcs/npc_sprites.png',
+            uid_map.get(npc_idx, "uid://npc_frames"), _animations_spec(npc_animations),
+            frame_size, output_path)
         
         print(f"Generated: {output_path}")
 
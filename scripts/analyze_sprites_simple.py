@@ -6,8 +6,11 @@ Falls back to reasonable defaults if analysis fails.
 
 import sys
 import os
+import re
 import struct
 
+_UID_RE = re.compile(rb'uid="([^"]+)"')
+
 def read_png_dimensions(filepath):
     """Read PNG width and height from file header."""
     with open(filepath, 'rb') as f:
@@ -48,25 +51,13 @@ def detect_frame_size_from_dimensions(width, height, preferred_size=None):
 
 def get_texture_uid(import_file):
     """Extract texture UID from .import file."""
-    if not os.path.exists(import_file):
+    try:
+        with open(import_file, 'rb') as f:
+            match = _UID_RE.search(f.read())
+    except OSError:
         return None
     
-    with open(import_file, 'r') as f:
-        for line in f:
-            if 'uid=' in line:
-                # Try to extract UID
-                if 'uid="' in line:
-                    parts = line.split('uid="')
-                    if len(parts) > 1:
-                        return parts[1].split('"')[0]
-                elif 'uid=' in line:
-                    parts = line.split('uid=')
-                    if len(parts) > 1:
-                        uid_part = parts[1].strip().strip('"').strip("'")
-                        if uid_part.startswith('uid://'):
-                            return uid_part
-    
-    return None
+    return match.group(1).decode() if match else None
 
 def generate_player_spriteframes(image_path, output_path):
     """Generate player SpriteFrames with detected layout."""
@@ -112,42 +103,30 @@ def generate_player_spriteframes(image_path, output_path):
         f'region = Rect2(0, 0, {frame_size}, {frame_size})'
     )
     
-    # Walk animations
+    # Walk animations, plus walk left (flipped walk_right)
     anim_configs = [
-        ('walk_down', 0),
-        ('walk_up', 1 if rows > 1 else 0),
-        ('walk_right', 2 if rows > 2 else 0),
+        ('walk_down', 0, False),
+        ('walk_up', 1 if rows > 1 else 0, False),
+        ('walk_right', 2 if rows > 2 else 0, False),
     ]
+    if rows > 2:
+        anim_configs.append(('walk_left', 2, True))
     
-    for anim_name, row_idx in anim_configs:
+    # Frame x offsets are the same for every animation row
+    frame_xs = [frame_idx * frame_size for frame_idx in range(frames_per_anim)]
+    
+    for anim_name, row_idx, flip_h in anim_configs:
         if row_idx >= rows:
             continue
         
         y = row_idx * frame_size
-        for frame_idx in range(frames_per_anim):
-            if frame_idx >= cols:
-                break
-            x = frame_idx * frame_size
+        for frame_idx, x in enumerate(frame_xs):
             sub_id = f'AtlasTexture_{anim_name}_{frame_idx}'
             sub_resources.append(
                 f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
                 f'atlas = ExtResource("1_player")\n'
                 f'region = Rect2({x}, {y}, {frame_size}, {frame_size})'
-            )
-    
-    # Walk left (flipped walk_right)
-    if rows > 2:
-        y = 2 * frame_size
-        for frame_idx in range(frames_per_anim):
-            if frame_idx >= cols:
-                break
-            x = frame_idx * frame_size
-            sub_id = f'AtlasTexture_walk_left_{frame_idx}'
-            sub_resources.append(
-                f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                f'atlas = ExtResource("1_player")\n'
-                f'region = Rect2({x}, {y}, {frame_size}, {frame_size})\n'
-                f'flip_h = true'
+                + ('\nflip_h = true' if flip_h else '')
             )
     
     # Add sub-resources with proper spacing
@@ -168,10 +147,10 @@ def generate_player_spriteframes(image_path, output_path):
     lines.append('},')
     
     # Walk animations
-    for anim_name, row_idx in anim_configs:
+    for anim_name, row_idx, _ in anim_configs:
         if row_idx >= rows:
             continue
-        frame_refs = [f'SubResource("AtlasTexture_{anim_name}_{i}")' for i in range(frames_per_anim) if i < cols]
+        frame_refs = [f'SubResource("AtlasTexture_{anim_name}_{i}")' for i in range(len(frame_xs))]
         if frame_refs:
             lines.append(f'"{anim_name}": {{')
             lines.append(f'"frames": [{", ".join(frame_refs)}],')
@@ -179,16 +158,6 @@ def generate_player_spriteframes(image_path, output_path):
             lines.append('"speed": 8.0')
             lines.append('},')
     
-    # Walk left
-    if rows > 2:
-        frame_refs = [f'SubResource("AtlasTexture_walk_left_{i}")' for i in range(frames_per_anim) if i < cols]
-        if frame_refs:
-            lines.append('"walk_left": {')
-            lines.append(f'"frames": [{", ".join(frame_refs)}],')
-            lines.append('"loop": true,')
-            lines.append('"speed": 8.0')
-            lines.append('},')
-    
     lines.append('}')
     
     with open(output_path, 'w') as f:
@@ -225,6 +194,9 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
     rows_per_npc = max(1, rows // npc_count)
     frames_per_anim = min(4, cols)
     
+    # Frame x offsets are the same for every animation row
+    frame_xs = [frame_idx * frame_size for frame_idx in range(frames_per_anim)]
+    
     uid_map = {
         0: "uid://b34fnliuo7eqq",
         1: "uid://b34gnliuo7eqr",
@@ -254,42 +226,27 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
                 f'region = Rect2({idle_col * frame_size}, {idle_row * frame_size}, {frame_size}, {frame_size})'
             )
         
-        # Walk animations (assume 3 rows per NPC: down, up, right)
+        # Walk animations (assume 3 rows per NPC: down, up, right),
+        # plus walk left (flipped walk_right)
+        right_row = npc_start_row + 2 if npc_start_row + 2 < rows else npc_start_row
         anim_configs = [
-            ('walk_down', npc_start_row),
-            ('walk_up', npc_start_row + 1 if npc_start_row + 1 < rows else npc_start_row),
-            ('walk_right', npc_start_row + 2 if npc_start_row + 2 < rows else npc_start_row),
+            ('walk_down', npc_start_row, False),
+            ('walk_up', npc_start_row + 1 if npc_start_row + 1 < rows else npc_start_row, False),
+            ('walk_right', right_row, False),
+            ('walk_left', right_row, True),
         ]
         
-        for anim_name, row_idx in anim_configs:
+        for anim_name, row_idx, flip_h in anim_configs:
             if row_idx >= rows:
                 continue
             y = row_idx * frame_size
-            for frame_idx in range(frames_per_anim):
-                if frame_idx >= cols:
-                    break
-                x = frame_idx * frame_size
+            for frame_idx, x in enumerate(frame_xs):
                 sub_id = f'AtlasTexture_{anim_name}_{frame_idx}'
                 sub_resources.append(
                     f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
                     f'atlas = ExtResource("1_npcs")\n'
                     f'region = Rect2({x}, {y}, {frame_size}, {frame_size})'
-                )
-        
-        # Walk left (flipped walk_right)
-        right_row = npc_start_row + 2 if npc_start_row + 2 < rows else npc_start_row
-        if right_row < rows:
-            y = right_row * frame_size
-            for frame_idx in range(frames_per_anim):
-                if frame_idx >= cols:
-                    break
-                x = frame_idx * frame_size
-                sub_id = f'AtlasTexture_walk_left_{frame_idx}'
-                sub_resources.append(
-                    f'[sub_resource type="AtlasTexture" id="{sub_id}"]\n'
-                    f'atlas = ExtResource("1_npcs")\n'
-                    f'region = Rect2({x}, {y}, {frame_size}, {frame_size})\n'
-                    f'flip_h = true'
+                    + ('\nflip_h = true' if flip_h else '')
                 )
         
         lines.extend(sub_resources)
@@ -306,10 +263,10 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
             lines.append('},')
         
         # Walk animations
-        for anim_name, row_idx in anim_configs:
+        for anim_name, row_idx, _ in anim_configs:
             if row_idx >= rows:
                 continue
-            frame_refs = [f'SubResource("AtlasTexture_{anim_name}_{i}")' for i in range(frames_per_anim) if i < cols]
+            frame_refs = [f'SubResource("AtlasTexture_{anim_name}_{i}")' for i in range(len(frame_xs))]
             if frame_refs:
                 lines.append(f'"{anim_name}": {{')
                 lines.append(f'"frames": [{", ".join(frame_refs)}],')
@@ -317,16 +274,6 @@ def generate_npc_spriteframes(image_path, output_paths, npc_count=3):
                 lines.append('"speed": 8.0')
                 lines.append('},')
         
-        # Walk left
-        if right_row < rows:
-            frame_refs = [f'SubResource("AtlasTexture_walk_left_{i}")' for i in range(frames_per_anim) if i < cols]
-            if frame_refs:
-                lines.append('"walk_left": {')
-                lines.append(f'"frames": [{", ".join(frame_refs)}],')
-                lines.append('"loop": true,')
-                lines.append('"speed": 8.0')
-                lines.append('},')
-        
         lines.append('}')
         
         with open(output_path, 'w') as f:
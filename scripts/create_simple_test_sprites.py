@@ -2,49 +2,94 @@
 """
 Create simple test sprites using basic Python (no PIL required).
 Creates minimal PNG files with colored pixels for testing.
+
+If the optional zlib-ng bindings are installed (pip install zlib-ng), they are
+used in place of the standard zlib module for faster deflate and CRC32.
 """
 
+import functools
+import io
+import itertools
 import struct
-import os
+from pathlib import Path
 
-def create_simple_png(width, height, color_r=255, color_g=255, color_b=255, color_a=255):
-    """Create a simple PNG with a solid color."""
+try:
+    from zlib_ng import zlib_ng as zlib
+except ImportError:
+    import zlib
 
+def filter_rows_up(rows):
+    """Yield PNG scanlines, using filter 0 (None) for the first row and 2 (Up) after.
+
+    With Up, a row identical to the one above becomes all zeros, which
+    deflates to almost nothing even at low compression levels.
+    """
+    prev = None
+    zero_row = b''
+    for row in rows:
+        if prev is None:
+            yield b'\x00' + row
+        elif row == prev:
+            if len(zero_row) != len(row):
+                zero_row = bytes(len(row))
+            yield b'\x02' + zero_row
+        else:
+            yield b'\x02' + bytes((a - b) & 0xff for a, b in zip(row, prev))
+        prev = row
+
+def encode_rgba_png(width, height, rows, level=1):
+    """Encode 8-bit RGBA pixel rows as a PNG.
+
+    Rows are filtered and deflated as they arrive, so the raw image is never
+    held in memory. Test sprites are written once, so the default level
+    favors speed.
+    """
     # PNG signature
     png_signature = b'\x89PNG\r\n\x1a\n'
 
     # IHDR chunk
-    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGBA
-    ihdr_crc = 0x9a7c8170  # Pre-calculated CRC for this IHDR
+    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)  # 8-bit RGBA
+    ihdr_crc = zlib.crc32(b'IHDR' + ihdr_data) & 0xffffffff
     ihdr_chunk = struct.pack('>I', 13) + b'IHDR' + ihdr_data + struct.pack('>I', ihdr_crc)
 
-    # IDAT chunk - simple solid color image data
-    # For simplicity, create a 1x1 pixel and repeat it
-    pixel_data = bytes([color_r, color_g, color_b, color_a])
-    scanline = b'\x00' + pixel_data * width  # Filter byte + pixel data
-    image_data = scanline * height
-
-    # Compress with zlib (simple case)
-    import zlib
-    compressed_data = zlib.compress(image_data)
-
-    idat_chunk = struct.pack('>I', len(compressed_data)) + b'IDAT' + compressed_data
-    idat_crc = zlib.crc32(b'IDAT' + compressed_data) & 0xffffffff
-    idat_chunk += struct.pack('>I', idat_crc)
+    # IDAT chunk - CRC covers the chunk type and the compressed data
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY)
+    idat_data = io.BytesIO()
+    idat_crc = zlib.crc32(b'IDAT')
+    for scanline in filter_rows_up(rows):
+        chunk = compressor.compress(scanline)
+        idat_data.write(chunk)
+        idat_crc = zlib.crc32(chunk, idat_crc)
+    chunk = compressor.flush()
+    idat_data.write(chunk)
+    idat_crc = zlib.crc32(chunk, idat_crc) & 0xffffffff
+    idat_chunk = struct.pack('>I', idat_data.tell()) + b'IDAT' + idat_data.getvalue() + struct.pack('>I', idat_crc)
 
     # IEND chunk
     iend_chunk = struct.pack('>I', 0) + b'IEND' + struct.pack('>I', 0xae426082)
 
     return png_signature + ihdr_chunk + idat_chunk + iend_chunk
 
-def create_test_sprite_sheet():
-    """Create a simple sprite sheet with different colored squares."""
+def create_simple_png(width, height, color_r=255, color_g=255, color_b=255, color_a=255, level=1):
+    """Create a simple PNG with a solid color."""
+    # For simplicity, create a 1x1 pixel and repeat it
+    pixel_data = bytes([color_r, color_g, color_b, color_a])
+    row = pixel_data * width
+
+    return encode_rgba_png(width, height, itertools.repeat(row, height), level)
+
+@functools.lru_cache(maxsize=None)
+def create_test_sprite_sheet(level=1):
+    """Create a simple sprite sheet with different colored squares.
+
+    The sheet is deterministic, so the encoded PNG is cached and every caller
+    asking for the same level gets the same bytes without re-encoding.
+    """
     # Create a 256x256 image with 4x4 grid of colored squares
     width, height = 256, 256
     square_size = 64  # 64x64 squares
 
     # Create base image data
-    pixels = []
     colors = [
         (255, 0, 0, 255),     # Red
         (0, 255, 0, 255),     # Green
@@ -64,88 +109,45 @@ def create_test_sprite_sheet():
         (64, 64, 64, 255),    # Dark Gray
     ]
 
-    for y in range(height):
-        for x in range(width):
-            square_x = x // square_size
-            square_y = y // square_size
-            color_index = (square_y * 4 + square_x) % len(colors)
-            r, g, b, a = colors[color_index]
-            pixels.extend([r, g, b, a])
+    # Every pixel row inside a band of squares is identical, so build one
+    # row per band from repeated color bytes and repeat it for the band's
+    # height
+    def rows():
+        for square_y in range(height // square_size):
+            row = b''.join(
+                bytes(colors[(square_y * 4 + square_x) % len(colors)]) * square_size
+                for square_x in range(width // square_size)
+            )
+            yield from itertools.repeat(row, square_size)
 
-    # Convert to bytes
-    image_data = bytes(pixels)
-
-    # Create PNG
-    png_signature = b'\x89PNG\r\n\x1a\n'
-
-    # IHDR chunk
-    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)  # 8-bit RGBA
-    ihdr_crc = 0x9a7c8170  # Pre-calculated CRC
-    ihdr_chunk = struct.pack('>I', 13) + b'IHDR' + ihdr_data + struct.pack('>I', ihdr_crc)
-
-    # IDAT chunk
-    import zlib
-    compressed_data = zlib.compress(image_data)
-
-    idat_chunk = struct.pack('>I', len(compressed_data)) + b'IDAT' + compressed_data
-    idat_crc = zlib.crc32(b'IDAT' + compressed_data) & 0xffffffff
-    idat_chunk += struct.pack('>I', idat_crc)
-
-    # IEND chunk
-    iend_chunk = struct.pack('>I', 0) + b'IEND' + struct.pack('>I', 0xae426082)
-
-    return png_signature + ihdr_chunk + idat_chunk + iend_chunk
+    return encode_rgba_png(width, height, rows(), level)
 
 def main():
     """Create test sprites."""
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-    # Create character sprite (simple colored grid)
-    print("Creating test character sprite...")
-    char_data = create_test_sprite_sheet()
-    char_path = os.path.join(project_root, 'assets', 'characters', 'player', 'player_character_wizard.png')
-    with open(char_path, 'wb') as f:
-        f.write(char_data)
-    print(f"Created: {char_path}")
-
-    # Copy for NPCs
-    npc_path = os.path.join(project_root, 'assets', 'characters', 'npcs', 'npc_sprites.png')
-    with open(npc_path, 'wb') as f:
-        f.write(char_data)
-    print(f"Created: {npc_path}")
-
-    # Create tile sprites (different colors)
-    print("Creating test tile sprites...")
-    tile_data = create_test_sprite_sheet()
-    interior_path = os.path.join(project_root, 'assets', 'tilesets', 'interior', 'interior_tileset.png')
-    with open(interior_path, 'wb') as f:
-        f.write(tile_data)
-    print(f"Created: {interior_path}")
-
-    exterior_path = os.path.join(project_root, 'assets', 'tilesets', 'exterior', 'exterior_tileset.png')
-    with open(exterior_path, 'wb') as f:
-        f.write(tile_data)
-    print(f"Created: {exterior_path}")
-
-    # Create chess assets
-    chess_data = create_test_sprite_sheet()
-    chess_path = os.path.join(project_root, 'assets', 'chess', 'board', 'chess_board.png')
-    with open(chess_path, 'wb') as f:
-        f.write(chess_data)
-    print(f"Created: {chess_path}")
-
-    pieces_data = create_test_sprite_sheet()
-    pieces_path = os.path.join(project_root, 'assets', 'chess', 'pieces', 'chess_pieces.png')
-    with open(pieces_path, 'wb') as f:
-        f.write(pieces_data)
-    print(f"Created: {pieces_path}")
-
-    # Create UI kit (simple colored areas)
-    ui_data = create_simple_png(512, 256, 100, 150, 200, 255)  # Light blue
-    ui_path = os.path.join(project_root, 'assets', 'ui', 'ui_kit.png')
-    with open(ui_path, 'wb') as f:
-        f.write(ui_data)
-    print(f"Created: {ui_path}")
+    project_root = Path(__file__).resolve().parent.parent
+    assets = project_root / 'assets'
+
+    # Every sprite sheet uses the same colored grid, so encode it once
+    print("Creating test sprites...")
+    sheet_data = create_test_sprite_sheet()
+    outputs = [
+        # Character sprite (simple colored grid), copied for NPCs
+        (assets / 'characters' / 'player' / 'player_character_wizard.png', sheet_data),
+        (assets / 'characters' / 'npcs' / 'npc_sprites.png', sheet_data),
+        # Tile sprites
+        (assets / 'tilesets' / 'interior' / 'interior_tileset.png', sheet_data),
+        (assets / 'tilesets' / 'exterior' / 'exterior_tileset.png', sheet_data),
+        # Chess assets
+        (assets / 'chess' / 'board' / 'chess_board.png', sheet_data),
+        (assets / 'chess' / 'pieces' / 'chess_pieces.png', sheet_data),
+        # UI kit (simple colored areas)
+        (assets / 'ui' / 'ui_kit.png', create_simple_png(512, 256, 100, 150, 200, 255)),  # Light blue
+    ]
+
+    for path, data in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        print(f"Created: {path}")
 
     print("\nTest sprites created! Now regenerate the resource files.")
 
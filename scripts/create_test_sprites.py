@@ -4,13 +4,21 @@ Create simple test sprites for the Wizard Chess validation scenes.
 Generates colored rectangles to test the animation and UI systems.
 """
 
-from PIL import Image, ImageDraw
-import os
+import io
+from pathlib import Path
 
-def create_colored_rectangle(width, height, color):
-    """Create a simple colored rectangle."""
-    img = Image.new('RGBA', (width, height), color)
-    return img
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = ImageDraw = None
+
+import create_simple_test_sprites
+
+def encode_png(image):
+    """Encode an image as PNG bytes so it can be written to several paths."""
+    buf = io.BytesIO()
+    image.save(buf, format='PNG')
+    return buf.getvalue()
 
 def create_character_sprite_sheet():
     """Create a simple character sprite sheet with colored rectangles."""
@@ -32,22 +40,17 @@ def create_character_sprite_sheet():
         (255, 255, 100, 255),  # Yellow - walk_right
     ]
 
-    # Create frames
+    # Draw frames straight onto the sheet
+    draw = ImageDraw.Draw(sheet)
+    border_color = (255, 255, 255, 255)  # White border
     for row in range(rows):
         for col in range(cols):
             x = col * frame_size
             y = row * frame_size
 
-            # Create a colored rectangle with a border
-            frame = create_colored_rectangle(frame_size, frame_size, colors[row])
-
-            # Add a simple border
-            draw = ImageDraw.Draw(frame)
-            border_color = (255, 255, 255, 255)  # White border
-            draw.rectangle([2, 2, frame_size-3, frame_size-3], outline=border_color, width=2)
-
-            # Paste onto sheet
-            sheet.paste(frame, (x, y))
+            # Colored rectangle with a simple border
+            draw.rectangle([x, y, x+frame_size-1, y+frame_size-1], fill=colors[row])
+            draw.rectangle([x+2, y+2, x+frame_size-3, y+frame_size-3], outline=border_color, width=2)
 
     return sheet
 
@@ -72,6 +75,8 @@ def create_tile_sprite_sheet():
         (255, 165, 0, 255),   # Orange - accent
     ]
 
+    draw = ImageDraw.Draw(sheet)
+    border_color = (255, 255, 255, 255)
     for row in range(rows):
         for col in range(cols):
             x = col * tile_size
@@ -80,14 +85,9 @@ def create_tile_sprite_sheet():
             color_index = (row * cols + col) % len(tile_colors)
             color = tile_colors[color_index]
 
-            tile = create_colored_rectangle(tile_size, tile_size, color)
-
-            # Add a simple border
-            draw = ImageDraw.Draw(tile)
-            border_color = (255, 255, 255, 255)
-            draw.rectangle([1, 1, tile_size-2, tile_size-2], outline=border_color, width=1)
-
-            sheet.paste(tile, (x, y))
+            # Colored tile with a simple border
+            draw.rectangle([x, y, x+tile_size-1, y+tile_size-1], fill=color)
+            draw.rectangle([x+1, y+1, x+tile_size-2, y+tile_size-2], outline=border_color, width=1)
 
     return sheet
 
@@ -99,94 +99,31 @@ def create_ui_sprite_sheet():
 
     ui_sheet = Image.new('RGBA', (ui_width, ui_height), (0, 0, 0, 0))
 
-    # Dialogue panel (top left)
-    dialogue_panel = create_colored_rectangle(256, 64, (50, 50, 80, 255))
-    draw = ImageDraw.Draw(dialogue_panel)
-    draw.rectangle([5, 5, 251, 59], outline=(255, 255, 255, 255), width=2)
-    ui_sheet.paste(dialogue_panel, (0, 0))
-
-    # Menu panel (top right)
-    menu_panel = create_colored_rectangle(200, 100, (80, 80, 50, 255))
-    draw = ImageDraw.Draw(menu_panel)
-    draw.rectangle([5, 5, 195, 95], outline=(255, 255, 255, 255), width=2)
-    ui_sheet.paste(menu_panel, (256, 0))
-
-    # Info panel (bottom left)
-    info_panel = create_colored_rectangle(200, 80, (60, 80, 60, 255))
-    draw = ImageDraw.Draw(info_panel)
-    draw.rectangle([5, 5, 195, 75], outline=(255, 255, 255, 255), width=2)
-    ui_sheet.paste(info_panel, (0, 100))
-
-    # Buttons (bottom right area)
-    button_normal = create_colored_rectangle(80, 24, (100, 100, 100, 255))
-    draw = ImageDraw.Draw(button_normal)
-    draw.rectangle([2, 2, 77, 21], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(button_normal, (256, 120))
-
-    button_hover = create_colored_rectangle(80, 24, (120, 120, 120, 255))
-    draw = ImageDraw.Draw(button_hover)
-    draw.rectangle([2, 2, 77, 21], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(button_hover, (256, 150))
-
-    button_pressed = create_colored_rectangle(80, 24, (80, 80, 80, 255))
-    draw = ImageDraw.Draw(button_pressed)
-    draw.rectangle([2, 2, 77, 21], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(button_pressed, (256, 180))
-
-    # Icons
-    icon_chess = create_colored_rectangle(32, 32, (200, 200, 100, 255))
-    draw = ImageDraw.Draw(icon_chess)
-    draw.rectangle([2, 2, 29, 29], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(icon_chess, (350, 120))
-
-    icon_inventory = create_colored_rectangle(32, 32, (100, 200, 200, 255))
-    draw = ImageDraw.Draw(icon_inventory)
-    draw.rectangle([2, 2, 29, 29], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(icon_inventory, (390, 120))
-
-    icon_settings = create_colored_rectangle(32, 32, (200, 100, 200, 255))
-    draw = ImageDraw.Draw(icon_settings)
-    draw.rectangle([2, 2, 29, 29], outline=(255, 255, 255, 255), width=1)
-    ui_sheet.paste(icon_settings, (430, 120))
+    # Each element is a filled rectangle plus a white border, both drawn
+    # straight onto the sheet; the border box is relative to the element
+    draw = ImageDraw.Draw(ui_sheet)
+    for x, y, w, h, color, (bx0, by0, bx1, by1), border in [
+        # Panels
+        (0, 0, 256, 64, (50, 50, 80, 255), (5, 5, 251, 59), 2),        # Dialogue (top left)
+        (256, 0, 200, 100, (80, 80, 50, 255), (5, 5, 195, 95), 2),     # Menu (top right)
+        (0, 100, 200, 80, (60, 80, 60, 255), (5, 5, 195, 75), 2),      # Info (bottom left)
+        # Buttons (bottom right area)
+        (256, 120, 80, 24, (100, 100, 100, 255), (2, 2, 77, 21), 1),   # Normal
+        (256, 150, 80, 24, (120, 120, 120, 255), (2, 2, 77, 21), 1),   # Hover
+        (256, 180, 80, 24, (80, 80, 80, 255), (2, 2, 77, 21), 1),      # Pressed
+        # Icons
+        (350, 120, 32, 32, (200, 200, 100, 255), (2, 2, 29, 29), 1),   # Chess
+        (390, 120, 32, 32, (100, 200, 200, 255), (2, 2, 29, 29), 1),   # Inventory
+        (430, 120, 32, 32, (200, 100, 200, 255), (2, 2, 29, 29), 1),   # Settings
+    ]:
+        draw.rectangle([x, y, x + w - 1, y + h - 1], fill=color)
+        draw.rectangle([x + bx0, y + by0, x + bx1, y + by1],
+                       outline=(255, 255, 255, 255), width=border)
 
     return ui_sheet
 
-def main():
-    """Create test sprites for all asset types."""
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-    # Create character sprites
-    print("Creating character sprites...")
-    char_sheet = create_character_sprite_sheet()
-    char_path = os.path.join(project_root, 'assets', 'characters', 'player', 'player_character_wizard.png')
-    char_sheet.save(char_path)
-    print(f"Saved: {char_path}")
-
-    # Copy for NPCs
-    npc_path = os.path.join(project_root, 'assets', 'characters', 'npcs', 'npc_sprites.png')
-    char_sheet.save(npc_path)
-    print(f"Saved: {npc_path}")
-
-    # Create tile sprites
-    print("Creating tile sprites...")
-    tile_sheet = create_tile_sprite_sheet()
-    interior_path = os.path.join(project_root, 'assets', 'tilesets', 'interior', 'interior_tileset.png')
-    tile_sheet.save(interior_path)
-    print(f"Saved: {interior_path}")
-
-    exterior_path = os.path.join(project_root, 'assets', 'tilesets', 'exterior', 'exterior_tileset.png')
-    tile_sheet.save(exterior_path)
-    print(f"Saved: {exterior_path}")
-
-    # Create chess board
-    print("Creating chess board...")
-    chess_sheet = create_tile_sprite_sheet()
-    chess_path = os.path.join(project_root, 'assets', 'chess', 'board', 'chess_board.png')
-    chess_sheet.save(chess_path)
-    print(f"Saved: {chess_path}")
-
-    # Create chess pieces (smaller sprites)
-    print("Creating chess pieces...")
+def create_chess_piece_sheet():
+    """Create a chess piece sheet: one row per color, one column per piece."""
     piece_size = 32
     piece_sheet = Image.new('RGBA', (piece_size * 6, piece_size * 2), (0, 0, 0, 0))
 
@@ -197,37 +134,59 @@ def main():
 
     piece_types = ['pawn', 'rook', 'knight', 'bishop', 'queen', 'king']
 
+    draw = ImageDraw.Draw(piece_sheet)
     for color_idx, color in enumerate(piece_colors):
         y = color_idx * piece_size
         for piece_idx, piece_type in enumerate(piece_types):
             x = piece_idx * piece_size
 
-            piece = create_colored_rectangle(piece_size, piece_size, color)
-            draw = ImageDraw.Draw(piece)
-            draw.rectangle([2, 2, piece_size-3, piece_size-3], outline=(255, 255, 255, 255), width=1)
+            draw.rectangle([x, y, x+piece_size-1, y+piece_size-1], fill=color)
+            draw.rectangle([x+2, y+2, x+piece_size-3, y+piece_size-3], outline=(255, 255, 255, 255), width=1)
+
+    return piece_sheet
+
+def main():
+    """Create test sprites for all asset types."""
+    project_root = Path(__file__).resolve().parent.parent
+    assets = project_root / 'assets'
+
+    print("Creating character sprites...")
+    char_data = encode_png(create_character_sprite_sheet())
 
-            piece_sheet.paste(piece, (x, y))
+    print("Creating tile sprites...")
+    tile_data = encode_png(create_tile_sprite_sheet())
 
-    pieces_path = os.path.join(project_root, 'assets', 'chess', 'pieces', 'chess_pieces.png')
-    piece_sheet.save(pieces_path)
-    print(f"Saved: {pieces_path}")
+    print("Creating chess pieces...")
+    pieces_data = encode_png(create_chess_piece_sheet())
 
-    # Create UI sprites
     print("Creating UI sprites...")
-    ui_sheet = create_ui_sprite_sheet()
-    ui_path = os.path.join(project_root, 'assets', 'ui', 'ui_kit.png')
-    ui_sheet.save(ui_path)
-    print(f"Saved: {ui_path}")
+    ui_data = encode_png(create_ui_sprite_sheet())
+
+    outputs = [
+        # Character sprites, copied for NPCs
+        (assets / 'characters' / 'player' / 'player_character_wizard.png', char_data),
+        (assets / 'characters' / 'npcs' / 'npc_sprites.png', char_data),
+        # Tile sprites; the chess board uses the same tiles
+        (assets / 'tilesets' / 'interior' / 'interior_tileset.png', tile_data),
+        (assets / 'tilesets' / 'exterior' / 'exterior_tileset.png', tile_data),
+        (assets / 'chess' / 'board' / 'chess_board.png', tile_data),
+        (assets / 'chess' / 'pieces' / 'chess_pieces.png', pieces_data),
+        (assets / 'ui' / 'ui_kit.png', ui_data),
+    ]
+
+    for path, data in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        print(f"Saved: {path}")
 
     print("\nTest sprites created! Now regenerate the resource files...")
 
 if __name__ == '__main__':
-    try:
-        import PIL
+    if Image is not None:
         main()
-    except ImportError:
+    else:
         print("PIL/Pillow not installed. Install with: pip install Pillow")
         print("Creating placeholder sprites with basic colors...")
 
         # Fallback: create simple colored images
-        create_fallback_sprites()
\ No newline at end of file
+        create_simple_test_sprites.main()
\ No newline at end of file
@@ -6,36 +6,52 @@ Comprehensive asset fixing script:
 3. Fix tilesets to show individual tiles
 """
 
+import functools
+import io
 import os
 import struct
 
+from analyze_sprites_simple import get_texture_uid
+
+ATLAS_TPL = (
+    '[sub_resource type="AtlasTexture"]\n'
+    'atlas = ExtResource("1_texture")\n'
+    'region = Rect2({x}, {y}, {s}, {s})\n'
+)
+
+ANIM_TPL = (
+    '"{name}": {{\n'
+    '"frames": [{frames}],\n'
+    '"loop": true,\n'
+    '"speed": {speed}\n'
+    '}},\n'
+)
+
+@functools.lru_cache(maxsize=None)
 def read_png_dimensions(filepath):
     """Read PNG width and height from file header."""
-    with open(filepath, 'rb') as f:
-        if f.read(8) != b'\x89PNG\r\n\x1a\n':
-            return None
-        chunk_length = struct.unpack('>I', f.read(4))[0]
-        chunk_type = f.read(4)
-        if chunk_type == b'IHDR':
-            width = struct.unpack('>I', f.read(4))[0]
-            height = struct.unpack('>I', f.read(4))[0]
-            return width, height
-    return None
-
-def get_texture_uid(import_file):
-    """Extract texture UID from .import file."""
-    if not os.path.exists(import_file):
+    # Signature (8) + IHDR length (4) + type (4) + width (4) + height (4)
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        data = os.read(fd, 24)
+    finally:
+        os.close(fd)
+    if len(data) < 24 or data[:8] != b'\x89PNG\r\n\x1a\n' or data[12:16] != b'IHDR':
         return None
-    with open(import_file, 'r') as f:
-        for line in f:
-            if 'uid=' in line:
-                if 'uid="' in line:
-                    parts = line.split('uid="')
-                    if len(parts) > 1:
-                        return parts[1].split('"')[0]
-    return None
+    return struct.unpack('>II', data[16:24])
 
-def fix_spriteframes(image_path, output_path, uid, texture_uid, frame_size=64, start_row=0, rows_per_char=3):
+def _write_tres(output_path, content):
+    """Write a resource file, skipping the write when it is already up to date."""
+    try:
+        with open(output_path, 'r') as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    with open(output_path, 'w') as f:
+        f.write(content)
+
+def fix_spriteframes(project_root, image_path, output_path, uid, texture_uid, frame_size=64, start_row=0, rows_per_char=3):
     """Fix SpriteFrames with correct load_steps count."""
     dims = read_png_dimensions(image_path)
     if not dims:
@@ -53,25 +69,24 @@ def fix_spriteframes(image_path, output_path, uid, texture_uid, frame_size=64, s
     sub_count += frames_per_anim  # walk_left
     load_steps = 2 + sub_count  # ext_resource + sub_resources
     
-    lines = [
-        f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{uid}"]',
-        '',
-        f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://{os.path.relpath(image_path, project_root).replace(os.sep, "/")}" id="1_texture"]',
-        ''
-    ]
+    buf = io.StringIO()
+    buf.write(f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{uid}"]\n\n')
+    buf.write(f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://{os.path.relpath(image_path, project_root).replace(os.sep, "/")}" id="1_texture"]\n')
     
-    sub_resources = []
     sub_index = 1  # SubResource indices start at 1
     
+    def add_atlas(x, y, flip_h=False):
+        nonlocal sub_index
+        buf.write('\n')
+        buf.write(ATLAS_TPL.format(x=x, y=y, s=frame_size))
+        if flip_h:
+            buf.write('flip_h = true\n')
+        ref = f'SubResource({sub_index})'
+        sub_index += 1
+        return ref
+    
     # Idle
-    y = start_row * frame_size
-    sub_resources.append(
-        f'[sub_resource type="AtlasTexture"]\n'
-        f'atlas = ExtResource("1_texture")\n'
-        f'region = Rect2(0, {y}, {frame_size}, {frame_size})'
-    )
-    idle_ref = f'SubResource({sub_index})'
-    sub_index += 1
+    idle_ref = add_atlas(0, start_row * frame_size)
     
     # Walk animations
     anim_configs = [
@@ -85,73 +100,32 @@ def fix_spriteframes(image_path, output_path, uid, texture_uid, frame_size=64, s
         if row_idx >= rows:
             continue
         y = row_idx * frame_size
-        frame_refs = []
-        for frame_idx in range(frames_per_anim):
-            if frame_idx >= cols:
-                break
-            x = frame_idx * frame_size
-            sub_resources.append(
-                f'[sub_resource type="AtlasTexture"]\n'
-                f'atlas = ExtResource("1_texture")\n'
-                f'region = Rect2({x}, {y}, {frame_size}, {frame_size})'
-            )
-            frame_refs.append(f'SubResource({sub_index})')
-            sub_index += 1
-        anim_refs[anim_name] = frame_refs
+        anim_refs[anim_name] = [add_atlas(frame_idx * frame_size, y) for frame_idx in range(frames_per_anim)]
     
     # Walk left (flipped walk_right)
     if 'walk_right' in anim_refs:
         right_row = start_row + 2 if start_row + 2 < rows else start_row
         y = right_row * frame_size
-        left_refs = []
-        for frame_idx in range(frames_per_anim):
-            if frame_idx >= cols:
-                break
-            x = frame_idx * frame_size
-            sub_resources.append(
-                f'[sub_resource type="AtlasTexture"]\n'
-                f'atlas = ExtResource("1_texture")\n'
-                f'region = Rect2({x}, {y}, {frame_size}, {frame_size})\n'
-                f'flip_h = true'
-            )
-            left_refs.append(f'SubResource({sub_index})')
-            sub_index += 1
-        anim_refs['walk_left'] = left_refs
-    
-    # Write sub-resources
-    for i, sub_res in enumerate(sub_resources):
-        if i > 0:
-            lines.append('')
-        lines.append(sub_res)
-    
-    lines.append('')
-    lines.append('[resource]')
-    lines.append('animations = {')
+        anim_refs['walk_left'] = [add_atlas(frame_idx * frame_size, y, flip_h=True) for frame_idx in range(frames_per_anim)]
+    
+    buf.write('\n[resource]\n')
+    buf.write('animations = {\n')
     
     # Idle
-    lines.append('"idle": {')
-    lines.append(f'"frames": [{idle_ref}],')
-    lines.append('"loop": true,')
-    lines.append('"speed": 2.0')
-    lines.append('},')
+    buf.write(ANIM_TPL.format(name='idle', frames=idle_ref, speed=2.0))
     
     # Walk animations
     for anim_name in ['walk_down', 'walk_up', 'walk_right', 'walk_left']:
         if anim_name in anim_refs and anim_refs[anim_name]:
-            lines.append(f'"{anim_name}": {{')
-            lines.append(f'"frames": [{", ".join(anim_refs[anim_name])}],')
-            lines.append('"loop": true,')
-            lines.append('"speed": 8.0')
-            lines.append('},')
+            buf.write(ANIM_TPL.format(name=anim_name, frames=', '.join(anim_refs[anim_name]), speed=8.0))
     
-    lines.append('}')
+    buf.write('}')
     
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    _write_tres(output_path, buf.getvalue())
     
     return True
 
-def fix_tileset(image_path, output_path, uid, texture_uid, tile_size=32):
+def fix_tileset(project_root, image_path, output_path, uid, texture_uid, tile_size=32):
     """Fix tileset to show all individual tiles."""
     dims = read_png_dimensions(image_path)
     if not dims:
@@ -164,34 +138,25 @@ def fix_tileset(image_path, output_path, uid, texture_uid, tile_size=32):
     # Count all tiles
     tile_count = cols * rows
     
-    lines = [
-        f'[gd_resource type="TileSet" load_steps=3 format=3 uid="{uid}"]',
-        '',
-        f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://{os.path.relpath(image_path, project_root).replace(os.sep, "/")}" id="1_texture"]',
-        '',
-        '[sub_resource type="TileSetAtlasSource" id="TileSetAtlasSource_1"]',
-        'texture = ExtResource("1_texture")',
-        ''
-    ]
+    buf = io.StringIO()
+    buf.write(f'[gd_resource type="TileSet" load_steps=3 format=3 uid="{uid}"]\n\n')
+    buf.write(f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://{os.path.relpath(image_path, project_root).replace(os.sep, "/")}" id="1_texture"]\n\n')
+    buf.write('[sub_resource type="TileSetAtlasSource" id="TileSetAtlasSource_1"]\n')
+    buf.write('texture = ExtResource("1_texture")\n\n')
     
     # Add all tiles
-    for row in range(rows):
-        for col in range(cols):
-            lines.append(f'{col}:{row}/0 = 0')
+    buf.write('\n'.join(['%d:%d/0 = 0' % (col, row) for row in range(rows) for col in range(cols)]))
     
-    lines.append('')
-    lines.append('[resource]')
-    lines.append(f'tile_size = Vector2i({tile_size}, {tile_size})')
-    lines.append('sources/0 = SubResource("TileSetAtlasSource_1")')
+    buf.write('\n\n[resource]\n')
+    buf.write(f'tile_size = Vector2i({tile_size}, {tile_size})\n')
+    buf.write('sources/0 = SubResource("TileSetAtlasSource_1")')
     
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(lines))
+    _write_tres(output_path, buf.getvalue())
     
     return True
 
-def fix_ui_assets():
+def fix_ui_assets(project_root):
     """Fix UI asset slicing - create properly sized AtlasTextures."""
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     ui_img = os.path.join(project_root, 'assets', 'ui', 'ui_kit.png')
     
     if not os.path.exists(ui_img):
@@ -237,18 +202,14 @@ def fix_ui_assets():
         
         uid = uid_map.get(rel_path, 'uid://ui_element')
         
-        lines = [
-            f'[gd_resource type="AtlasTexture" load_steps=2 format=3 uid="{uid}"]',
-            '',
-            f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://assets/ui/ui_kit.png" id="1_ui"]',
-            '',
-            '[resource]',
-            'atlas = ExtResource("1_ui")',
-            f'region = Rect2({x}, {y}, {w}, {h})'
-        ]
+        buf = io.StringIO()
+        buf.write(f'[gd_resource type="AtlasTexture" load_steps=2 format=3 uid="{uid}"]\n\n')
+        buf.write(f'[ext_resource type="Texture2D" uid="{texture_uid}" path="res://assets/ui/ui_kit.png" id="1_ui"]\n\n')
+        buf.write('[resource]\n')
+        buf.write('atlas = ExtResource("1_ui")\n')
+        buf.write(f'region = Rect2({x}, {y}, {w}, {h})')
         
-        with open(output_path, 'w') as f:
-            f.write('\n'.join(lines))
+        _write_tres(output_path, buf.getvalue())
 
 if __name__ == '__main__':
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -261,7 +222,7 @@ if __name__ == '__main__':
     
     if os.path.exists(player_img):
         print("Fixing player SpriteFrames...")
-        fix_spriteframes(player_img, player_output, "uid://mg0soy5bnyun", player_uid, frame_size=64, start_row=0)
+        fix_spriteframes(project_root, player_img, player_output, "uid://mg0soy5bnyun", player_uid, frame_size=64, start_row=0)
     
     # Fix NPCs
     npc_img = os.path.join(project_root, 'assets', 'characters', 'npcs', 'npc_sprites.png')
@@ -278,7 +239,7 @@ if __name__ == '__main__':
         print("Fixing NPC SpriteFrames...")
         for filename, uid, start_row in npc_configs:
             output = os.path.join(project_root, 'assets', '_imported', filename)
-            fix_spriteframes(npc_img, output, uid, npc_uid, frame_size=64, start_row=start_row)
+            fix_spriteframes(project_root, npc_img, output, uid, npc_uid, frame_size=64, start_row=start_row)
     
     # Fix tilesets
     interior_img = os.path.join(project_root, 'assets', 'tilesets', 'interior', 'interior_tileset.png')
@@ -288,7 +249,7 @@ if __name__ == '__main__':
     
     if os.path.exists(interior_img):
         print("Fixing interior tileset...")
-        fix_tileset(interior_img, interior_output, "uid://qd3slad5x2k3", interior_uid, tile_size=32)
+        fix_tileset(project_root, interior_img, interior_output, "uid://qd3slad5x2k3", interior_uid, tile_size=32)
     
     exterior_img = os.path.join(project_root, 'assets', 'tilesets', 'exterior', 'exterior_tileset.png')
     exterior_output = os.path.join(project_root, 'assets', '_imported', 'exterior_tileset.tres')
@@ -297,10 +258,10 @@ if __name__ == '__main__':
     
     if os.path.exists(exterior_img):
         print("Fixing exterior tileset...")
-        fix_tileset(exterior_img, exterior_output, "uid://b385bcauwog0h", exterior_uid, tile_size=32)
+        fix_tileset(project_root, exterior_img, exterior_output, "uid://b385bcauwog0h", exterior_uid, tile_size=32)
     
     # Fix UI assets
     print("Fixing UI assets...")
-    fix_ui_assets()
+    fix_ui_assets(project_root)
     
     print("\nAll assets fixed!")
@@ -6,40 +6,32 @@ Fix SpriteFrames format to use numeric SubResource indices instead of string IDs
 import os
 import re
 
+_SUB_RESOURCE_ID_RE = re.compile(r'^\[sub_resource.*?id="([^"]+)"', re.MULTILINE)
+_SUB_RESOURCE_REF_RE = re.compile(r'SubResource\("([^"]+)"\)')
+
 def fix_spriteframes_file(filepath):
     """Fix SubResource references to use numeric indices."""
     with open(filepath, 'r') as f:
         content = f.read()
     
-    # Find all sub_resource definitions and map them to indices
-    sub_resources = []
-    lines = content.split('\n')
-    
     # First pass: find all sub_resources and assign indices
+    # Start from 1 (0 is reserved for ExtResource)
     sub_resource_map = {}  # maps id to index
-    current_index = 1  # Start from 1 (0 is reserved for ExtResource)
+    for current_index, match in enumerate(_SUB_RESOURCE_ID_RE.finditer(content), start=1):
+        sub_resource_map[match.group(1)] = current_index
     
-    for i, line in enumerate(lines):
-        if line.startswith('[sub_resource'):
-            # Extract the id
-            match = re.search(r'id="([^"]+)"', line)
-            if match:
-                sub_id = match.group(1)
-                sub_resource_map[sub_id] = current_index
-                current_index += 1
+    # Second pass: replace SubResource("id") with SubResource(index) in one scan,
+    # leaving references to unknown ids untouched
+    def replace_ref(match):
+        index = sub_resource_map.get(match.group(1))
+        return match.group(0) if index is None else f'SubResource({index})'
     
-    # Second pass: replace SubResource("id") with SubResource(index)
-    new_lines = []
-    for line in lines:
-        # Replace SubResource("id") with SubResource(index)
-        # Handle both SubResource("id") and SubResource("id") formats
-        for sub_id, index in sub_resource_map.items():
-            line = line.replace(f'SubResource("{sub_id}")', f'SubResource({index})')
-        new_lines.append(line)
+    new_content = _SUB_RESOURCE_REF_RE.sub(replace_ref, content)
     
-    # Write back
-    with open(filepath, 'w') as f:
-        f.write('\n'.join(new_lines))
+    # Write back, unless the file was already fixed
+    if new_content != content:
+        with open(filepath, 'w') as f:
+            f.write(new_content)
     
     print(f"Fixed {filepath}: {len(sub_resource_map)} sub-resources mapped")
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Numba kernels for png_tools.
+
+png_tools imports this lazily (see `_numba_kernels`) so that scripts which only
+read PNG headers do not pay for importing Numba. Requires NumPy and Numba.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(inline="always", cache=True)
+def paeth(a: int, b: int, c: int) -> int:
+	# Same arithmetic as png_tools._paeth on int32 inputs; LLVM lowers the
+	# abs() calls and selects without branches
+	pa = b - c
+	pb = a - c
+	pc = abs(pa + pb)
+	pa = abs(pa)
+	pb = abs(pb)
+	if pa <= pb and pa <= pc:
+		return a
+	return b if pb <= pc else c
+
+
+@njit(cache=True)
+def unfilter_average_row(src, prev, dst, bpp: int) -> None:
+	# Same as png_tools._unfilter_average_row, but reads `src` and writes the uint8 row `dst`
+	for x in range(bpp):
+		dst[x] = (np.int32(src[x]) + (np.int32(prev[x]) >> 1)) & 0xFF
+	for x in range(bpp, dst.shape[0]):
+		dst[x] = (np.int32(src[x]) + ((np.int32(dst[x - bpp]) + np.int32(prev[x])) >> 1)) & 0xFF
+
+
+@njit(cache=True)
+def unfilter_paeth_row(src, prev, dst, bpp: int) -> None:
+	# Same as png_tools._unfilter_paeth_row, but reads `src` and writes the uint8 row `dst`
+	for x in range(dst.shape[0]):
+		b = np.int32(prev[x])
+		a = np.int32(0)
+		c = np.int32(0)
+		if x >= bpp:
+			a = np.int32(dst[x - bpp])
+			c = np.int32(prev[x - bpp])
+		dst[x] = (np.int32(src[x]) + paeth(a, b, c)) & 0xFF
+
+
+@njit(cache=True)
+def floodfill(rgba, w: int, h: int, seeds, tol_sq: int) -> None:
+	# Same breadth-first fill as png_tools.background_to_alpha_floodfill;
+	# clears alpha in the flat RGBA uint8 array `rgba` in place
+	n = w * h
+	visited = np.zeros(n, dtype=np.uint8)
+	queue = np.empty(n, dtype=np.int32)
+	tail = 0
+	for x in range(w):
+		for idx in (x, n - w + x):
+			if visited[idx] == 0:
+				visited[idx] = 1
+				queue[tail] = idx
+				tail += 1
+	for y in range(h):
+		for idx in (y * w, y * w + w - 1):
+			if visited[idx] == 0:
+				visited[idx] = 1
+				queue[tail] = idx
+				tail += 1
+
+	head = 0
+	while head < tail:
+		idx = np.int64(queue[head])
+		head += 1
+		i = idx * 4
+		r = np.int32(rgba[i])
+		g = np.int32(rgba[i + 1])
+		b = np.int32(rgba[i + 2])
+		is_bg = False
+		for k in range(seeds.shape[0]):
+			dr = r - seeds[k, 0]
+			dg = g - seeds[k, 1]
+			db = b - seeds[k, 2]
+			if dr * dr + dg * dg + db * db <= tol_sq:
+				is_bg = True
+				break
+		if not is_bg:
+			continue
+
+		rgba[i + 3] = 0
+
+		x = idx % w
+		for ni in (
+			idx - 1 if x > 0 else -1,
+			idx + 1 if x + 1 < w else -1,
+			idx - w,
+			idx + w if idx + w < n else -1,
+		):
+			if ni >= 0 and visited[ni] == 0:
+				visited[ni] = 1
+				queue[tail] = ni
+				tail += 1
@@ -15,7 +15,7 @@ import os
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
-from png_tools import read_png
+from png_tools import read_png_header
 
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -41,29 +41,33 @@ def write_tileset(
 	tileset_uid: str,
 	tile_size: int = 32,
 ) -> None:
-	dims = read_png(png_path)
-	w, h = dims.width, dims.height
+	w, h = read_png_header(png_path)
 	cols = w // tile_size
 	rows = h // tile_size
 
-	lines: List[str] = []
-	lines += [f'[gd_resource type="TileSet" load_steps=3 format=3 uid="{tileset_uid}"]', ""]
-	lines += [
-		f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]',
-		"",
-		'[sub_resource type="TileSetAtlasSource" id="TileSetAtlasSource_1"]',
-		'texture = ExtResource("1_texture")',
-		f'texture_region_size = Vector2i({tile_size}, {tile_size})',
-		"",
-	]
-	for y in range(rows):
-		for x in range(cols):
-			lines.append(f"{x}:{y}/0 = 0")
-	lines += ["", "[resource]", f"tile_size = Vector2i({tile_size}, {tile_size})", 'sources/0 = SubResource("TileSetAtlasSource_1")']
-
 	os.makedirs(os.path.dirname(out_tres_path), exist_ok=True)
 	with open(out_tres_path, "w", encoding="utf-8") as f:
-		f.write("\n".join(lines))
+		write = f.write
+
+		def line(s: str = "") -> None:
+			write(s)
+			write("\n")
+
+		line(f'[gd_resource type="TileSet" load_steps=3 format=3 uid="{tileset_uid}"]')
+		line()
+		line(f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]')
+		line()
+		line('[sub_resource type="TileSetAtlasSource" id="TileSetAtlasSource_1"]')
+		line('texture = ExtResource("1_texture")')
+		line(f"texture_region_size = Vector2i({tile_size}, {tile_size})")
+		line()
+		for y in range(rows):
+			for x in range(cols):
+				line(f"{x}:{y}/0 = 0")
+		line()
+		line("[resource]")
+		line(f"tile_size = Vector2i({tile_size}, {tile_size})")
+		write('sources/0 = SubResource("TileSetAtlasSource_1")')
 
 
 def write_spriteframes_player(
@@ -85,80 +89,69 @@ def write_spriteframes_player(
 	"""
 	frames_per_anim = cols_used
 
-	# subresource count: 1 idle + 3*frames + frames flipped
-	sub_count = 1 + 3 * frames_per_anim + frames_per_anim
+	# subresource count: 3*frames + frames flipped (idle reuses the first walk_down frame)
+	sub_count = 3 * frames_per_anim + frames_per_anim
 	load_steps = 2 + sub_count
 
-	lines: List[str] = []
-	lines += [f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{frames_uid}"]', ""]
-	lines += [
-		f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]',
-		"",
-	]
-
-	sub_blocks: List[str] = []
-
-	def add_atlas(id_name: str, x: int, y: int, flip_h: bool = False) -> str:
-		block = [
-			f'[sub_resource type="AtlasTexture" id="{id_name}"]',
-			'atlas = ExtResource("1_texture")',
-			f"region = Rect2({x}, {y}, {frame_size}, {frame_size})",
-		]
-		if flip_h:
-			block.append("flip_h = true")
-		sub_blocks.append("\n".join(block))
-		return id_name
-
-	# idle = first frame of walk_down
-	idle_id = add_atlas("at_idle", start_col * frame_size, start_row * frame_size, flip_h=False)
-
-	def frames_for_row(prefix: str, row: int) -> List[str]:
-		y = row * frame_size
-		ids: List[str] = []
+	with open(out_tres_path, "w", encoding="utf-8") as f:
+		write = f.write
+
+		def line(s: str = "") -> None:
+			write(s)
+			write("\n")
+
+		line(f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{frames_uid}"]')
+		line()
+		line(f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]')
+		line()
+
+		# Subresources are written as they are created, each followed by a blank line
+		def add_atlas(id_name: str, x: int, y: int, flip_h: bool = False) -> str:
+			line(f'[sub_resource type="AtlasTexture" id="{id_name}"]')
+			line('atlas = ExtResource("1_texture")')
+			line(f"region = Rect2({x}, {y}, {frame_size}, {frame_size})")
+			if flip_h:
+				line("flip_h = true")
+			line()
+			return id_name
+
+		def frames_for_row(prefix: str, row: int) -> List[str]:
+			y = row * frame_size
+			ids: List[str] = []
+			for c in range(frames_per_anim):
+				ids.append(add_atlas("%s_%d" % (prefix, c), (start_col + c) * frame_size, y, flip_h=False))
+			return ids
+
+		down = frames_for_row("at_down", start_row + 0)
+		# idle = first frame of walk_down, so it shares that subresource
+		idle_id = down[0]
+		up = frames_for_row("at_up", start_row + 1)
+		right = frames_for_row("at_right", start_row + 2)
+		left: List[str] = []
 		for c in range(frames_per_anim):
-			ids.append(add_atlas("%s_%d" % (prefix, c), (start_col + c) * frame_size, y, flip_h=False))
-		return ids
-
-	down = frames_for_row("at_down", start_row + 0)
-	up = frames_for_row("at_up", start_row + 1)
-	right = frames_for_row("at_right", start_row + 2)
-	left: List[str] = []
-	for c in range(frames_per_anim):
-		left.append(add_atlas("at_left_%d" % c, (start_col + c) * frame_size, (start_row + 2) * frame_size, flip_h=True))
-
-	# write subresources
-	for i, block in enumerate(sub_blocks):
-		if i > 0:
-			lines.append("")
-		lines.append(block)
-
-	lines += ["", "[resource]", "animations = {"]  # Godot's SpriteFrames dict format
-	lines += [
-		'"idle": {',
-		f'"frames": [SubResource("{idle_id}")],',
-		'"loop": true,',
-		'"speed": 2.0',
-		"},",
-	]
-
-	def anim_block(name: str, ids: List[str]) -> List[str]:
-		var_frames = ", ".join([f'SubResource("{i}")' for i in ids])
-		return [
-			f'"{name}": {{',
-			f'"frames": [{var_frames}],',
-			'"loop": true,',
-			'"speed": 8.0',
-			"},",
-		]
-
-	lines += anim_block("walk_down", down)
-	lines += anim_block("walk_up", up)
-	lines += anim_block("walk_right", right)
-	lines += anim_block("walk_left", left)
-	lines += ["}"]
+			left.append(add_atlas("at_left_%d" % c, (start_col + c) * frame_size, (start_row + 2) * frame_size, flip_h=True))
 
-	with open(out_tres_path, "w", encoding="utf-8") as f:
-		f.write("\n".join(lines))
+		line("[resource]")
+		line("animations = {")  # Godot's SpriteFrames dict format
+		line('"idle": {')
+		line(f'"frames": [SubResource("{idle_id}")],')
+		line('"loop": true,')
+		line('"speed": 2.0')
+		line("},")
+
+		def anim_block(name: str, ids: List[str]) -> None:
+			var_frames = ", ".join([f'SubResource("{i}")' for i in ids])
+			line(f'"{name}": {{')
+			line(f'"frames": [{var_frames}],')
+			line('"loop": true,')
+			line('"speed": 8.0')
+			line("},")
+
+		anim_block("walk_down", down)
+		anim_block("walk_up", up)
+		anim_block("walk_right", right)
+		anim_block("walk_left", left)
+		write("}")
 
 
 def write_spriteframes_npcs(
@@ -178,77 +171,66 @@ def write_spriteframes_npcs(
 	for npc_idx, (out_path, frames_uid) in enumerate(out_paths_and_uids):
 		start_col = npc_idx * 2
 		frames_per_anim = 2
-		sub_count = 1 + 3 * frames_per_anim + frames_per_anim
+		sub_count = 3 * frames_per_anim + frames_per_anim
 		load_steps = 2 + sub_count
 
-		lines: List[str] = []
-		lines += [f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{frames_uid}"]', ""]
-		lines += [
-			f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]',
-			"",
-		]
-
-		sub_blocks: List[str] = []
-
-		def add_atlas(id_name: str, x: int, y: int, flip_h: bool = False) -> str:
-			block = [
-				f'[sub_resource type="AtlasTexture" id="{id_name}"]',
-				'atlas = ExtResource("1_texture")',
-				f"region = Rect2({x}, {y}, {frame_size}, {frame_size})",
-			]
-			if flip_h:
-				block.append("flip_h = true")
-			sub_blocks.append("\n".join(block))
-			return id_name
-
-		idle_id = add_atlas("at_idle", start_col * frame_size, 0 * frame_size)
-
-		def frames_for_row(prefix: str, row: int) -> List[str]:
-			y = row * frame_size
-			ids: List[str] = []
-			for c in range(frames_per_anim):
-				ids.append(add_atlas("%s_%d" % (prefix, c), (start_col + c) * frame_size, y, flip_h=False))
-			return ids
-
-		down = frames_for_row("at_down", 0)
-		up = frames_for_row("at_up", 1)
-		right = frames_for_row("at_right", 2)
-		left: List[str] = []
-		for c in range(frames_per_anim):
-			left.append(add_atlas("at_left_%d" % c, (start_col + c) * frame_size, 2 * frame_size, flip_h=True))
-
-		for i, block in enumerate(sub_blocks):
-			if i > 0:
-				lines.append("")
-			lines.append(block)
-
-		lines += ["", "[resource]", "animations = {"]
-		lines += [
-			'"idle": {',
-			f'"frames": [SubResource("{idle_id}")],',
-			'"loop": true,',
-			'"speed": 2.0',
-			"},",
-		]
-
-		def anim_block(name: str, ids: List[str]) -> List[str]:
-			var_frames = ", ".join([f'SubResource("{i}")' for i in ids])
-			return [
-				f'"{name}": {{',
-				f'"frames": [{var_frames}],',
-				'"loop": true,',
-				'"speed": 6.0',
-				"},",
-			]
-
-		lines += anim_block("walk_down", down)
-		lines += anim_block("walk_up", up)
-		lines += anim_block("walk_right", right)
-		lines += anim_block("walk_left", left)
-		lines += ["}"]
-
 		with open(out_path, "w", encoding="utf-8") as f:
-			f.write("\n".join(lines))
+			write = f.write
+
+			def line(s: str = "") -> None:
+				write(s)
+				write("\n")
+
+			line(f'[gd_resource type="SpriteFrames" load_steps={load_steps} format=3 uid="{frames_uid}"]')
+			line()
+			line(f'[ext_resource type="Texture2D" path="{_rel_res(png_path)}" id="1_texture"]')
+			line()
+
+			def add_atlas(id_name: str, x: int, y: int, flip_h: bool = False) -> str:
+				line(f'[sub_resource type="AtlasTexture" id="{id_name}"]')
+				line('atlas = ExtResource("1_texture")')
+				line(f"region = Rect2({x}, {y}, {frame_size}, {frame_size})")
+				if flip_h:
+					line("flip_h = true")
+				line()
+				return id_name
+
+			def frames_for_row(prefix: str, row: int) -> List[str]:
+				y = row * frame_size
+				ids: List[str] = []
+				for c in range(frames_per_anim):
+					ids.append(add_atlas("%s_%d" % (prefix, c), (start_col + c) * frame_size, y, flip_h=False))
+				return ids
+
+			down = frames_for_row("at_down", 0)
+			idle_id = down[0]
+			up = frames_for_row("at_up", 1)
+			right = frames_for_row("at_right", 2)
+			left: List[str] = []
+			for c in range(frames_per_anim):
+				left.append(add_atlas("at_left_%d" % c, (start_col + c) * frame_size, 2 * frame_size, flip_h=True))
+
+			line("[resource]")
+			line("animations = {")
+			line('"idle": {')
+			line(f'"frames": [SubResource("{idle_id}")],')
+			line('"loop": true,')
+			line('"speed": 2.0')
+			line("},")
+
+			def anim_block(name: str, ids: List[str]) -> None:
+				var_frames = ", ".join([f'SubResource("{i}")' for i in ids])
+				line(f'"{name}": {{')
+				line(f'"frames": [{var_frames}],')
+				line('"loop": true,')
+				line('"speed": 6.0')
+				line("},")
+
+			anim_block("walk_down", down)
+			anim_block("walk_up", up)
+			anim_block("walk_right", right)
+			anim_block("walk_left", left)
+			write("}")
 
 
 def write_atlas_texture(
@@ -259,18 +241,17 @@ def write_atlas_texture(
 	region: Tuple[int, int, int, int],
 ) -> None:
 	x, y, w, h = region
-	lines = [
-		f'[gd_resource type="AtlasTexture" load_steps=2 format=3 uid="{uid}"]',
-		"",
-		f'[ext_resource type="Texture2D" uid="{texture_uid}" path="{texture_res_path}" id="1_tex"]',
-		"",
-		"[resource]",
-		'atlas = ExtResource("1_tex")',
-		f"region = Rect2({x}, {y}, {w}, {h})",
-	]
 	os.makedirs(os.path.dirname(out_path), exist_ok=True)
 	with open(out_path, "w", encoding="utf-8") as f:
-		f.write("\n".join(lines))
+		f.write(
+			f'[gd_resource type="AtlasTexture" load_steps=2 format=3 uid="{uid}"]\n'
+			"\n"
+			f'[ext_resource type="Texture2D" uid="{texture_uid}" path="{texture_res_path}" id="1_tex"]\n'
+			"\n"
+			"[resource]\n"
+			'atlas = ExtResource("1_tex")\n'
+			f"region = Rect2({x}, {y}, {w}, {h})"
+		)
 
 
 def main() -> None: